@@ -1,4 +1,5 @@
 import json
+from typing import IO
 from autogen_ext.tools.mcp import McpServerParams, StdioServerParams, SseServerParams
 from schemas.component import ComponentInfo
 from schemas.agent import AgentType, AssistantAgentConfig, UserProxyAgentConfig
@@ -12,16 +13,42 @@ AgentInfo: dict[str, ComponentInfo] = {}
 GraphFlowInfo: dict[str, GraphFlowConfig] = {}
 GroupChatInfo: dict[str, GroupChatConfig] = {}
 
-def extract_mcp_tools(mcp_tools: list[str]) -> list[McpServerParams]:
+def extract_mcp_tools(mcp_tools: list[str], mcp_info: dict[str, McpServerParams] | None = None) -> list[McpServerParams]:
+    if mcp_info is None:
+        mcp_info = McpInfo
     tools = []
     for mcp_tool in mcp_tools:
-        tools.append(McpInfo[mcp_tool])
+        tools.append(mcp_info[mcp_tool])
     return tools
 
-def load_info(config_path: str="config.json"):
-    with open(config_path, "r", encoding="utf-8") as f:
-        metadata = parse_cwd_placeholders(f.read())
-        metadata = json.loads(metadata)
+def default_registry() -> dict[str, dict]:
+    """The process-wide registries, keyed by the config section they hold"""
+    return {
+        "mcpServers": McpInfo,
+        "agents": AgentInfo,
+        "graph_flows": GraphFlowInfo,
+        "group_chats": GroupChatInfo,
+    }
+
+def load_info(config_path: str | IO[str] | IO[bytes]="config.json", registry: dict[str, dict] | None = None):
+    # registry defaults to the module-level dicts; pass your own to keep
+    # the loaded components isolated (e.g. per test)
+    if registry is None:
+        registry = default_registry()
+    mcp_info = registry.setdefault("mcpServers", {})
+    agent_info = registry.setdefault("agents", {})
+    graph_flow_info = registry.setdefault("graph_flows", {})
+    group_chat_info = registry.setdefault("group_chats", {})
+    if hasattr(config_path, "read"):
+        # already opened file or in-memory buffer
+        raw = config_path.read()
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+    else:
+        with open(config_path, "r", encoding="utf-8") as f:
+            raw = f.read()
+    metadata = parse_cwd_placeholders(raw)
+    metadata = json.loads(metadata)
     mcp_factory_func = {
         "stdio": StdioServerParams,
         "sse": SseServerParams
@@ -35,7 +62,7 @@ def load_info(config_path: str="config.json"):
                 mcp_type = "sse"
             else:
                 mcp_type = "stdio"
-        McpInfo[name] = mcp_factory_func[mcp_type](**mcp_config)
+        mcp_info[name] = mcp_factory_func[mcp_type](**mcp_config)
     
     agent_factory_func = {
         AgentType.ASSISTANT_AGENT: AssistantAgentConfig,
@@ -44,23 +71,23 @@ def load_info(config_path: str="config.json"):
     }
     for name, agent_config in metadata["agents"].items():
         if agent_config.get("mcp_tools", None):
-            agent_config["mcp_tools"] = extract_mcp_tools(agent_config["mcp_tools"])
+            agent_config["mcp_tools"] = extract_mcp_tools(agent_config["mcp_tools"], mcp_info)
         if agent_config.get("prompt_path", None):
             agent_config["prompt"] = lambda agent_path=agent_config["prompt_path"]: get_prompt(
                 agent_path=agent_path, 
                 prompt_path=prompt_root
             )
-        AgentInfo[name] = agent_factory_func[agent_config["type"]](**agent_config)
+        agent_info[name] = agent_factory_func[agent_config["type"]](**agent_config)
 
     
     for name, graph_flow_config in metadata["graph_flows"].items():
-        GraphFlowInfo[name] = GraphFlowConfig(**graph_flow_config)
+        graph_flow_info[name] = GraphFlowConfig(**graph_flow_config)
     
     for name, group_chat_config in metadata["group_chats"].items():
         group_chat_type = group_chat_config.get("type", None)
         if group_chat_type == GroupChatTypeEnum.SELECTOR_GROUP_CHAT.value:
-            GroupChatInfo[name] = SelectorGroupChatConfig(**group_chat_config)
+            group_chat_info[name] = SelectorGroupChatConfig(**group_chat_config)
         elif group_chat_type == GroupChatTypeEnum.ROUND_ROBIN_GROUP_CHAT.value:
-            GroupChatInfo[name] = RoundRobinGroupChatConfig(**group_chat_config)
+            group_chat_info[name] = RoundRobinGroupChatConfig(**group_chat_config)
         else:
             raise ValueError(f"Invalid group chat type: {group_chat_type}")
\ No newline at end of file
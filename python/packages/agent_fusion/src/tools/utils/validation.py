@@ -5,22 +5,128 @@ Provides comprehensive error handling and input validation
 
 import re
 import os
+import threading
 from pathlib import Path
-from typing import Union, List, Optional, Any, Dict
+from typing import Union, List, Optional, Any, Callable, Dict, Tuple
 import logging
 
 # Set up logging for tools
 logger = logging.getLogger(__name__)
 
+# Process-wide cache of compiled regexes shared by every validator in this
+# module. Lookups are lock-free; only inserts take the lock.
+_RE_CACHE: Dict[Tuple[str, int], "re.Pattern[str]"] = {}
+_RE_CACHE_MAX = 512
+_RE_LOCK = threading.Lock()
+
+
+def _cre(pattern: str, flags: int = 0) -> "re.Pattern[str]":
+    """Compile a regex through the shared module cache"""
+    key = (pattern, flags)
+    compiled = _RE_CACHE.get(key)
+    if compiled is None:
+        compiled = re.compile(pattern, flags)
+        with _RE_LOCK:
+            if len(_RE_CACHE) >= _RE_CACHE_MAX:
+                _RE_CACHE.clear()
+            _RE_CACHE[key] = compiled
+    return compiled
+
 
 class ValidationError(Exception):
     """Custom exception for validation errors"""
-    def __init__(self, message: str, error_code: str = None):
+    def __init__(self, message: str, error_code: Optional[str] = None) -> None:
         self.message = message
         self.error_code = error_code
         super().__init__(self.message)
 
 
+# Dangerous operations checked by ToolValidator.validate_code_snippet, in
+# order: (reported pattern, literal to search for, warn only). Entries with a
+# literal are found with str.find on folded code plus a word-boundary check on
+# the original code; the rest need the real regex.
+_DANGEROUS_PATTERNS: Tuple[Tuple[str, Optional[str], bool], ...] = (
+    (r'\bos\.system\b', "os.system", False),
+    (r'\bsubprocess\b', "subprocess", True),  # Allow subprocess but warn
+    (r'\bexec\b', "exec", False),
+    (r'\beval\b', "eval", False),
+    (r'\b__import__\b', "__import__", False),
+    (r'\bopen\s*\([^)]*["\'][wax]["\']', None, False),  # File operations in write/append mode
+    (r'\brmdir\b', "rmdir", False),
+    (r'\bunlink\b', "unlink", False),
+    (r'\bremove\b', "remove", False),
+)
+# Code shorter than this cannot contain any dangerous operation
+_MIN_DANGER_LENGTH = 4
+# Characters re.IGNORECASE matches to a letter of the literals above that
+# str.lower() does not map to it. 'İ' would also lower to two characters and
+# shift the folded code against the original.
+_FOLD_TABLE = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _fold(code: str) -> str:
+    """Lowercase code one character for one character, so that a lowercase
+    ASCII literal is found in the result exactly where re.IGNORECASE would
+    match it in code"""
+    return code.translate(_FOLD_TABLE).lower()
+
+
+def _contains_word(folded: str, word: str, text: str) -> bool:
+    """Equivalent of re.search(rf'\b{re.escape(word)}\b', text, re.IGNORECASE)
+    for lowercase words that start and end with a word character, given
+    folded = _fold(text)"""
+    pos = folded.find(word)
+    while pos != -1:
+        end = pos + len(word)
+        if (pos == 0 or not _is_word_char(text[pos - 1])) and (end == len(text) or not _is_word_char(text[end])):
+            return True
+        pos = folded.find(word, pos + 1)
+    return False
+
+
+def _scan_dangerous(code: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Scan code for the operations in _DANGEROUS_PATTERNS in a single pass
+
+    Args:
+        code: Code snippet to scan
+
+    Returns:
+        The first prohibited pattern found (or None) and the warn-only
+        patterns seen before it
+    """
+    warned: List[str] = []
+    if len(code) < _MIN_DANGER_LENGTH:
+        return None, warned
+
+    folded = _fold(code)
+    for pattern, literal, warn_only in _DANGEROUS_PATTERNS:
+        if literal is not None:
+            matched = _contains_word(folded, literal, code)
+        else:
+            matched = "open" in folded and _cre(pattern, re.IGNORECASE).search(code) is not None
+        if matched:
+            if not warn_only:
+                return pattern, warned
+            warned.append(pattern)
+    return None, warned
+
+
+# Error formatters used by ToolValidator.safe_execute, looked up along the
+# exception's MRO so subclasses resolve to their nearest registered base.
+_ERR_FORMATTERS: Dict[type, Callable[[Any], str]] = {
+    ValidationError: lambda e: f"Validation Error [{e.error_code}]: {e.message}",
+    PermissionError: lambda e: f"Permission Error: {str(e)}",
+    FileNotFoundError: lambda e: f"File Not Found Error: {str(e)}",
+    OSError: lambda e: f"OS Error: {str(e)}",
+    ImportError: lambda e: f"Import Error: {str(e)}",
+}
+
+
 class ToolValidator:
     """Utility class for validating tool inputs and handling errors safely"""
     
@@ -45,23 +151,25 @@ class ToolValidator:
             if not file_path or not isinstance(file_path, str):
                 raise ValidationError("File path must be a non-empty string", "INVALID_PATH")
             
-            # Convert to Path and resolve
-            base = Path(base_path).resolve()
-            full_path = base / file_path
+            # Resolve on plain strings; a Path is only built for the return value
+            base = os.path.realpath(base_path)
+            full_path = os.path.join(base, file_path)
             
             # Security check - ensure path is within base directory
             try:
-                full_path.resolve().relative_to(base.resolve())
+                inside = os.path.commonpath([os.path.realpath(full_path), base]) == base
             except ValueError:
+                inside = False
+            if not inside:
                 raise ValidationError(f"Path '{file_path}' is outside the allowed directory", "PATH_TRAVERSAL")
             
-            if must_exist and not full_path.exists():
+            if must_exist and not os.path.exists(full_path):
                 raise ValidationError(f"Path does not exist: {file_path}", "PATH_NOT_FOUND")
             
-            if must_exist and must_be_file and not full_path.is_file():
+            if must_exist and must_be_file and not os.path.isfile(full_path):
                 raise ValidationError(f"Path is not a file: {file_path}", "NOT_A_FILE")
             
-            return full_path
+            return Path(full_path)
             
         except ValidationError:
             raise
@@ -87,7 +195,7 @@ class ToolValidator:
                 raise ValidationError("Pattern must be a non-empty string", "INVALID_PATTERN")
             
             # Test compile the regex
-            re.compile(pattern)
+            _cre(pattern)
             return pattern
             
         except re.error as e:
@@ -118,25 +226,10 @@ class ToolValidator:
                 raise ValidationError(f"Code exceeds maximum length of {max_length} characters", "CODE_TOO_LONG")
             
             # Basic security checks - block potentially dangerous imports/functions
-            dangerous_patterns = [
-                r'\bos\.system\b',
-                r'\bsubprocess\b',  # Allow subprocess but warn
-                r'\bexec\b',
-                r'\beval\b',
-                r'\b__import__\b',
-                r'\bopen\s*\([^)]*["\'][wax]["\']',  # File operations in write/append mode
-                r'\brmdir\b',
-                r'\bunlink\b',
-                r'\bremove\b',
-            ]
-            
-            warnings = []
-            for pattern in dangerous_patterns:
-                if re.search(pattern, code, re.IGNORECASE):
-                    if 'subprocess' in pattern:
-                        warnings.append(f"Code contains potentially dangerous operation: {pattern}")
-                    else:
-                        raise ValidationError(f"Code contains prohibited operation: {pattern}", "DANGEROUS_CODE")
+            prohibited, warned = _scan_dangerous(code)
+            if prohibited is not None:
+                raise ValidationError(f"Code contains prohibited operation: {prohibited}", "DANGEROUS_CODE")
+            warnings = [f"Code contains potentially dangerous operation: {pattern}" for pattern in warned]
             
             # Try to compile the code to check basic syntax
             try:
@@ -157,12 +250,15 @@ class ToolValidator:
             raise ValidationError(f"Code validation failed: {str(e)}", "CODE_VALIDATION_ERROR")
     
     @staticmethod
-    def validate_document_id(document_id: Union[str, List[str]]) -> Union[str, List[str]]:
+    def validate_document_id(document_id: Union[str, List[str]], in_place: bool = False) -> Union[str, List[str]]:
         """
         Validate document ID(s) for vector database operations
         
         Args:
             document_id: Single ID or list of IDs
+            in_place: Write stripped IDs back into the given list instead of
+                allocating a new one. The list is left untouched if any ID
+                is invalid
             
         Returns:
             Validated ID(s)
@@ -172,21 +268,26 @@ class ToolValidator:
         """
         try:
             if isinstance(document_id, str):
-                if not document_id.strip():
+                stripped = document_id.strip()
+                if not stripped:
                     raise ValidationError("Document ID cannot be empty", "EMPTY_ID")
-                return document_id.strip()
+                return stripped
             
             elif isinstance(document_id, list):
                 if not document_id:
                     raise ValidationError("Document ID list cannot be empty", "EMPTY_ID_LIST")
                 
-                validated_ids = []
+                # strip() only leaves nothing for empty or all-whitespace IDs, so
+                # the whole list is checked before anything is stripped or written
                 for idx, doc_id in enumerate(document_id):
-                    if not isinstance(doc_id, str) or not doc_id.strip():
+                    if not isinstance(doc_id, str) or not doc_id or doc_id.isspace():
                         raise ValidationError(f"Document ID at index {idx} is invalid", "INVALID_ID_IN_LIST")
-                    validated_ids.append(doc_id.strip())
                 
-                return validated_ids
+                if in_place:
+                    for idx, doc_id in enumerate(document_id):
+                        document_id[idx] = doc_id.strip()
+                    return document_id
+                return [doc_id.strip() for doc_id in document_id]
             
             else:
                 raise ValidationError("Document ID must be string or list of strings", "INVALID_ID_TYPE")
@@ -197,7 +298,7 @@ class ToolValidator:
             raise ValidationError(f"Document ID validation failed: {str(e)}", "ID_VALIDATION_ERROR")
     
     @staticmethod
-    def safe_execute(func, *args, **kwargs) -> str:
+    def safe_execute(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
         """
         Safely execute a function with comprehensive error handling
         
@@ -211,17 +312,11 @@ class ToolValidator:
         """
         try:
             return func(*args, **kwargs)
-        except ValidationError as e:
-            return f"Validation Error [{e.error_code}]: {e.message}"
-        except PermissionError as e:
-            return f"Permission Error: {str(e)}"
-        except FileNotFoundError as e:
-            return f"File Not Found Error: {str(e)}"
-        except OSError as e:
-            return f"OS Error: {str(e)}"
-        except ImportError as e:
-            return f"Import Error: {str(e)}"
         except Exception as e:
+            for cls in type(e).__mro__:
+                formatter = _ERR_FORMATTERS.get(cls)
+                if formatter is not None:
+                    return formatter(e)
             logger.exception("Unexpected error in tool execution")
             return f"Unexpected Error: {str(e)}"
     
@@ -244,7 +339,7 @@ class ToolValidator:
                 raise ValidationError("Collection name must be a non-empty string", "INVALID_COLLECTION_NAME")
             
             # Basic validation - alphanumeric, underscore, hyphen only
-            if not re.match(r'^[a-zA-Z0-9_-]+$', collection_name):
+            if not _cre(r'^[a-zA-Z0-9_-]+$').match(collection_name):
                 raise ValidationError("Collection name can only contain letters, numbers, underscores, and hyphens", "INVALID_COLLECTION_NAME")
             
             if len(collection_name) > 100:
@@ -259,10 +354,10 @@ class ToolValidator:
 
 
 # Convenience decorators for tool functions
-def validate_inputs(validator_func):
+def validate_inputs(validator_func: Callable[..., Tuple[tuple, Dict[str, Any]]]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """Decorator to validate inputs before function execution"""
-    def decorator(func):
-        def wrapper(*args, **kwargs):
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
             try:
                 # Validate inputs using the provided validator function
                 validated_args, validated_kwargs = validator_func(*args, **kwargs)
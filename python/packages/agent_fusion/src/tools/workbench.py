@@ -11,6 +11,7 @@ from autogen_agentchat.messages import TextMessage
 from autogen_core.tools import ToolSchema
 from autogen_core import CancellationToken
 import logging
+from collections import deque
 
 logger = logging.getLogger(TRACE_LOGGER_NAME)
 
@@ -43,27 +44,21 @@ class VectorStreamWorkbench(StaticStreamWorkbench):
         tool_overrides=tool_overrides
         )
        self._top_k = top_k
-       
-    def get_tools_for_context(self, context: Sequence[LLMMessage]) -> list[BaseTool]:
+       self._schema_cache: dict[int, ToolSchema] = {}
+       self._rebuild_schema_cache()
 
-        query = "\n".join([msg.content for msg in context if not isinstance(msg, SystemMessage)][-5:]).strip()
-        return self._get_tools_for_query(query)
-   
-    def _get_tools_for_query(self, query: str) -> list[ToolSchema]:        
-        # 使用DashScope重排序进行二次排序            
-        # reranked_tools = rerank_tools_with_dashscope(
-        #     query=query,
-        #     tools=self._tools,
-        #     top_n=self._top_k
-        # )
+    def _rebuild_schema_cache(self) -> None:
+        """Merge tool overrides into each tool schema once, keyed by tool id.
 
-        reranked_tools = self._tools
-        result_schemas: list[ToolSchema] = []
-        for tool in reranked_tools:
+        StaticStreamWorkbench fixes its tools and overrides at construction,
+        so this only runs from __init__."""
+        self._schema_cache = {}
+        has_overrides = bool(self._tool_overrides)
+        for tool in self._tools:
             original_schema = tool.schema
 
-            # Apply overrides if they exist for this toolp
-            if tool.name in self._tool_overrides:
+            # Apply overrides if they exist for this tool
+            if has_overrides and tool.name in self._tool_overrides:
                 override = self._tool_overrides[tool.name]
                 # Create a new ToolSchema with overrides applied
                 schema: ToolSchema = {
@@ -80,5 +75,27 @@ class VectorStreamWorkbench(StaticStreamWorkbench):
             else:
                 schema = original_schema
 
-            result_schemas.append(schema)
-        return reranked_tools
+            self._schema_cache[id(tool)] = schema
+       
+    def get_tools_for_context(self, context: Sequence[LLMMessage]) -> list[ToolSchema]:
+
+        # Walk from the tail so only the last 5 non-system messages are touched
+        recent: deque[str] = deque(maxlen=5)
+        for msg in reversed(context):
+            if type(msg) is not SystemMessage:
+                recent.appendleft(msg.content)
+                if len(recent) == recent.maxlen:
+                    break
+        query = "\n".join(recent).strip()
+        return self._get_tools_for_query(query)
+   
+    def _get_tools_for_query(self, query: str) -> list[ToolSchema]:        
+        # 使用DashScope重排序进行二次排序            
+        # reranked_tools = rerank_tools_with_dashscope(
+        #     query=query,
+        #     tools=self._tools,
+        #     top_n=self._top_k
+        # )
+
+        reranked_tools = self._tools
+        return [self._schema_cache[id(tool)] for tool in reranked_tools]
@@ -6,17 +6,38 @@ including run_stream integration and proper event dispatching.
 """
 
 import pytest
-import pytest_asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
 
 from autogen_core import CancellationToken
-from autogen_agentchat.messages import TextMessage, BaseAgentEvent, BaseChatMessage
+from autogen_agentchat.messages import TextMessage, ModelClientStreamingChunkEvent
 from autogen_agentchat.base import TaskResult
 
 from chainlit_web.ui_hook.autogen_chat_queue import AutoGenAgentChatQueue
 
+# Run these tests on uvloop when it is installed (see conftest.py) and
+# keep them on one xdist worker under --dist=loadgroup
+pytestmark = [pytest.mark.uvloop, pytest.mark.xdist_group(name="autogen_queue")]
+
+# Message-less task results shared by the tests; none of them are mutated
+_EMPTY_COMPLETED = TaskResult(messages=[], stop_reason="completed")
+_EMPTY_TEST = TaskResult(messages=[], stop_reason="test")
+_EMPTY_RECOVERED = TaskResult(messages=[], stop_reason="recovered")
+
+
+def _stream_factory(*events):
+    """Build a run_stream replacement that yields the given events on each call"""
+    async def _run(task, cancellation_token=None):
+        for event in events:
+            yield event
+    return _run
+
+
+async def _drain(queue, message, *, token=None):
+    """Start the queue, push one message and collect every event it yields"""
+    async with queue.start(cancellation_token=token):
+        return [event async for event in queue.push(message)]
+
 
 class TestAutoGenAgentChatQueue:
     """Test cases for AutoGenAgentChatQueue"""
@@ -24,19 +45,18 @@ class TestAutoGenAgentChatQueue:
     @pytest.fixture
     def mock_agent(self):
         """Create a mock agent with run_stream method"""
-        agent = MagicMock()
+        # The queue only calls run_stream, so a plain namespace stands in for the agent.
         # Don't use AsyncMock for run_stream since it needs to return an async generator
-        agent.run_stream = MagicMock()
-        return agent
+        return SimpleNamespace(run_stream=MagicMock())
 
     @pytest.fixture
     def agent_queue(self, mock_agent):
         """Create an AutoGenAgentChatQueue instance"""
         return AutoGenAgentChatQueue(mock_agent)
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def cancellation_token(self):
-        """Create a cancellation token for testing"""
+        """Create a cancellation token for testing; no test cancels it, so it is shared"""
         return CancellationToken()
 
     def test_initialization(self, mock_agent):
@@ -80,17 +100,10 @@ class TestAutoGenAgentChatQueue:
         test_message = TextMessage(content="Hello", source="user")
         test_result = TaskResult(messages=[test_message], stop_reason="completed")
         
-        async def mock_run_stream(task, cancellation_token=None):
-            yield test_message
-            yield test_result
-        
-        mock_agent.run_stream = MagicMock(side_effect=mock_run_stream)
+        mock_agent.run_stream = MagicMock(side_effect=_stream_factory(test_message, test_result))
         
         # Test the push method
-        events = []
-        async with agent_queue.start():
-            async for event in agent_queue.push("test message"):
-                events.append(event)
+        events = await _drain(agent_queue, "test message")
         
         # Verify events
         assert len(events) == 2
@@ -105,16 +118,11 @@ class TestAutoGenAgentChatQueue:
     @pytest.mark.asyncio
     async def test_push_with_cancellation_token(self, agent_queue, mock_agent, cancellation_token):
         """Test push method with cancellation token"""
-        test_result = TaskResult(messages=[], stop_reason="completed")
-        
-        async def mock_run_stream(task, cancellation_token=None):
-            yield test_result
+        test_result = _EMPTY_COMPLETED
         
-        mock_agent.run_stream = MagicMock(side_effect=mock_run_stream)
+        mock_agent.run_stream = MagicMock(side_effect=_stream_factory(test_result))
         
-        async with agent_queue.start(cancellation_token=cancellation_token):
-            async for event in agent_queue.push("test message"):
-                pass
+        await _drain(agent_queue, "test message", token=cancellation_token)
         
         # Verify cancellation token was passed
         call_args = mock_agent.run_stream.call_args
@@ -126,10 +134,8 @@ class TestAutoGenAgentChatQueue:
         # Setup mock to raise an exception
         mock_agent.run_stream.side_effect = Exception("Test error")
         
-        async with agent_queue.start():
-            with pytest.raises(RuntimeError, match="Error processing message"):
-                async for event in agent_queue.push("test message"):
-                    pass
+        with pytest.raises(RuntimeError, match="Error processing message"):
+            await _drain(agent_queue, "test message")
 
     @pytest.mark.asyncio
     async def test_message_dispatch_handlers(self, agent_queue):
@@ -141,17 +147,17 @@ class TestAutoGenAgentChatQueue:
         agent_queue.handle_unknown_message = AsyncMock()
         
         # Test TaskResult dispatch
-        task_result = TaskResult(messages=[], stop_reason="test")
+        task_result = _EMPTY_TEST
         await agent_queue._dispatch_message(task_result)
         agent_queue.handle_task_result.assert_called_once_with(task_result)
         
-        # Test BaseAgentEvent dispatch
-        agent_event = MagicMock(spec=BaseAgentEvent)
+        # Test BaseAgentEvent dispatch; any concrete event routes like the base class
+        agent_event = ModelClientStreamingChunkEvent(content="chunk", source="agent")
         await agent_queue._dispatch_message(agent_event)
         agent_queue.handle_agent_event.assert_called_once_with(agent_event)
         
         # Test BaseChatMessage dispatch
-        chat_message = MagicMock(spec=BaseChatMessage)
+        chat_message = TextMessage(content="Hello", source="agent")
         await agent_queue._dispatch_message(chat_message)
         agent_queue.handle_chat_message.assert_called_once_with(chat_message)
         
@@ -166,16 +172,11 @@ class TestAutoGenAgentChatQueue:
         # Mock task_finished method
         agent_queue.task_finished = AsyncMock()
         
-        test_result = TaskResult(messages=[], stop_reason="completed")
-        
-        async def mock_run_stream(task, cancellation_token=None):
-            yield test_result
+        test_result = _EMPTY_COMPLETED
         
-        mock_agent.run_stream = mock_run_stream
+        mock_agent.run_stream = _stream_factory(test_result)
         
-        async with agent_queue.start():
-            async for event in agent_queue.push("test message"):
-                pass
+        await _drain(agent_queue, "test message")
         
         # Verify task_finished was called
         agent_queue.task_finished.assert_called_once_with(test_result)
@@ -188,17 +189,9 @@ class TestAutoGenAgentChatQueue:
         message2 = TextMessage(content="Message 2", source="agent")
         task_result = TaskResult(messages=[message1, message2], stop_reason="completed")
         
-        async def mock_run_stream(task, cancellation_token=None):
-            yield message1
-            yield message2
-            yield task_result
+        mock_agent.run_stream = _stream_factory(message1, message2, task_result)
         
-        mock_agent.run_stream = mock_run_stream
-        
-        events = []
-        async with agent_queue.start():
-            async for event in agent_queue.push("test message"):
-                events.append(event)
+        events = await _drain(agent_queue, "test message")
         
         # Verify all events were processed
         assert len(events) == 3
@@ -229,9 +222,6 @@ class TestAutoGenAgentChatQueueIntegration:
     @pytest.mark.asyncio
     async def test_queue_with_mock_assistant_agent(self):
         """Test queue integration with a mock assistant agent"""
-        # Create a more realistic mock agent
-        mock_agent = MagicMock()
-        
         # Simulate realistic run_stream behavior
         async def realistic_run_stream(task, cancellation_token=None):
             # Agent processes the task and responds
@@ -245,15 +235,12 @@ class TestAutoGenAgentChatQueueIntegration:
                 stop_reason="task_completed"
             )
         
-        mock_agent.run_stream = realistic_run_stream
+        # Create a more realistic mock agent
+        mock_agent = SimpleNamespace(run_stream=realistic_run_stream)
         
         # Test the queue
         queue = AutoGenAgentChatQueue(mock_agent)
-        collected_events = []
-        
-        async with queue.start():
-            async for event in queue.push("Hello, how are you?"):
-                collected_events.append(event)
+        collected_events = await _drain(queue, "Hello, how are you?")
         
         # Verify the interaction
         assert len(collected_events) == 3
@@ -268,8 +255,6 @@ class TestAutoGenAgentChatQueueIntegration:
     @pytest.mark.asyncio
     async def test_queue_error_recovery(self):
         """Test queue behavior when agent encounters errors"""
-        mock_agent = MagicMock()
-        
         # First call fails, second succeeds
         call_count = 0
         async def failing_then_succeeding_run_stream(task, cancellation_token=None):
@@ -278,24 +263,19 @@ class TestAutoGenAgentChatQueueIntegration:
             if call_count == 1:
                 raise Exception("Simulated agent error")
             else:
-                yield TaskResult(messages=[], stop_reason="recovered")
+                yield _EMPTY_RECOVERED
         
-        mock_agent.run_stream = failing_then_succeeding_run_stream
+        mock_agent = SimpleNamespace(run_stream=failing_then_succeeding_run_stream)
         
         queue = AutoGenAgentChatQueue(mock_agent)
         
         # First call should fail
-        async with queue.start():
-            with pytest.raises(RuntimeError):
-                async for event in queue.push("First message"):
-                    pass
+        with pytest.raises(RuntimeError):
+            await _drain(queue, "First message")
         
         # Queue should still be usable after error
-        async with queue.start():
-            events = []
-            async for event in queue.push("Second message"):
-                events.append(event)
-            
-            assert len(events) == 1
-            assert isinstance(events[0], TaskResult)
-            assert events[0].stop_reason == "recovered"
\ No newline at end of file
+        events = await _drain(queue, "Second message")
+        
+        assert len(events) == 1
+        assert isinstance(events[0], TaskResult)
+        assert events[0].stop_reason == "recovered"
\ No newline at end of file
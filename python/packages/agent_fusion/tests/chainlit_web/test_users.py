@@ -6,28 +6,61 @@ including session management, chat lifecycle, component management, and settings
 """
 
 import pytest
-import asyncio
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
+from unittest.mock import Mock, AsyncMock, patch
+from contextlib import ExitStack
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+from types import SimpleNamespace
+from typing import Any, List
 
 # Import the classes under test
 from chainlit_web.users import User, UserSessionManager, UserSessionData
 from chainlit_web.ui_hook.ui_agent_builder import UIAgentBuilder
-from schemas.config_type import ComponentInfo
-from schemas.agent import AgentType
-from schemas.group_chat import GroupChatType as GroupChatTypeEnum
-from schemas.model_info import ModelClientConfig
-from data_layer.data_layer import AgentFusionDataLayer
+from schemas.agent import AgentType, AssistantAgentConfig
+from schemas.group_chat import GroupChatType as GroupChatTypeEnum, SelectorGroupChatConfig
+from schemas.model_info import ModelClientConfig, model_client
+from schemas.types import ComponentType
+from autogen_core.models import ModelFamily
 from chainlit.types import ChatProfile
-from autogen_core import CancellationToken
-import chainlit as cl
 
 
-@pytest.fixture
+# Component and model configs shared by the fixtures and tests; never mutated
+_TEST_AGENT_INFO = AssistantAgentConfig(
+    name="test_agent",
+    type=AgentType.ASSISTANT_AGENT,
+    description="Test assistant agent",
+    labels=["test"],
+    prompt_path="test.md",
+    model_client=model_client.deepseek_chat_DeepSeek
+)
+_TEST_GROUPCHAT_INFO = SelectorGroupChatConfig(
+    name="test_groupchat",
+    type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT,
+    description="Test group chat",
+    labels=["test"],
+    selector_prompt="test prompt",
+    model_client=model_client.deepseek_chat_DeepSeek,
+    participants=[]
+)
+_TEST_MODEL = ModelClientConfig(
+    type=ComponentType.LLM,
+    label="test_model",
+    model_name="test-model-1",
+    base_url="https://api.test.com",
+    family=ModelFamily.UNKNOWN,
+    api_key_type="TEST_API_KEY",
+    stream=True
+)
+# Errors injected into start_chat and setup_new_component
+_TEST_ERROR = RuntimeError("Test error")
+_SETUP_ERROR = RuntimeError("Setup error")
+
+
+@pytest.fixture(scope="module")
 def mock_context():
-    """Mock chainlit context for testing"""
-    with patch('chainlit_web.users.context') as mock_ctx:
+    """Mock chainlit context for testing, patched once per module"""
+    # Pass the replacement in: patch() would otherwise probe chainlit's lazy
+    # context proxy, which raises outside a chainlit session
+    with patch('chainlit_web.users.context', Mock()) as mock_ctx:
         mock_session = Mock()
         mock_session.id = "test_session_id"
         mock_session.user_env = {}
@@ -40,69 +73,99 @@ def mock_context():
         yield mock_ctx
 
 
+@pytest.fixture
+def mock_context_no_session(mock_context):
+    """The module's mock context with no active session"""
+    session = mock_context.session
+    mock_context.session = None
+    yield mock_context
+    mock_context.session = session
+
+
 @pytest.fixture
 def mock_user_session_manager():
     """Mock UserSessionManager for testing"""
     manager = UserSessionManager()
     manager.user_sessions = {}
     manager.component_info_map = {
-        "test_agent": ComponentInfo(
-            name="test_agent",
-            type=AgentType.ASSISTANT_AGENT,
-            description="Test assistant agent"
-        ),
-        "test_groupchat": ComponentInfo(
-            name="test_groupchat", 
-            type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT,
-            description="Test group chat"
-        )
+        "test_agent": _TEST_AGENT_INFO,
+        "test_groupchat": _TEST_GROUPCHAT_INFO,
     }
-    manager.model_list = [
-        ModelClientConfig(
-            label="test_model",
-            provider="test_provider",
-            model_name="test-model-1"
-        )
-    ]
+    manager.model_list = [_TEST_MODEL]
     return manager
 
 
+async def _aiter(items):
+    """Async iterable over items, for mocked queue pushes"""
+    for item in items:
+        yield item
+
+
+@dataclass
+class _StubDataLayer:
+    """Stand-in for AgentFusionDataLayer with only the parts User touches"""
+    agent: Any
+    group_chat: Any
+    llm: Any
+
+
+@dataclass
+class _Widget:
+    """Chat settings input with the fields settings_update reads"""
+    id: str
+    initial: str
+
+
+@dataclass
+class _Settings:
+    """Chat settings holding a list of input widgets"""
+    inputs: List[_Widget]
+
+
 @pytest.fixture
 def mock_data_layer():
     """Mock AgentFusionDataLayer for testing"""
-    data_layer = Mock(spec=AgentFusionDataLayer)
+    data_layer = _StubDataLayer(
+        agent=SimpleNamespace(get_all_components=AsyncMock()),
+        group_chat=SimpleNamespace(get_all_components=AsyncMock()),
+        llm=SimpleNamespace(get_component_by_name=AsyncMock()),
+    )
     
     # Mock agent methods
-    data_layer.agent = Mock()
-    data_layer.agent.get_all_components = AsyncMock(return_value=[
-        ComponentInfo(
-            name="test_agent",
-            type=AgentType.ASSISTANT_AGENT,
-            description="Test assistant agent"
-        )
-    ])
+    data_layer.agent.get_all_components.return_value = [_TEST_AGENT_INFO]
     
     # Mock group chat methods
-    data_layer.group_chat = Mock()
-    data_layer.group_chat.get_all_components = AsyncMock(return_value=[
-        ComponentInfo(
-            name="test_groupchat",
-            type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT,
-            description="Test group chat"
-        )
-    ])
+    data_layer.group_chat.get_all_components.return_value = [_TEST_GROUPCHAT_INFO]
     
     # Mock LLM methods
-    data_layer.llm = Mock()
-    data_layer.llm.get_component_by_name = AsyncMock(return_value=ModelClientConfig(
-        label="test_model",
-        provider="test_provider",
-        model_name="test-model-1"
-    ))
+    data_layer.llm.get_component_by_name.return_value = _TEST_MODEL
     
     return data_layer
 
 
+@pytest.fixture
+def user(mock_context, mock_user_session_manager, monkeypatch):
+    """User bound to the mocked context and session manager"""
+    monkeypatch.setattr(User, "user_session_manager", mock_user_session_manager)
+    return User()
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _patch_cl_message():
+    """Keep chainlit's Message class patched for the whole module"""
+    with patch('chainlit_web.users.cl.Message') as message_cls:
+        message_cls.return_value = AsyncMock()
+        yield message_cls
+
+
+@pytest.fixture
+def mock_cl_message(_patch_cl_message):
+    """The patched Message class with the previous test's calls cleared"""
+    _patch_cl_message.reset_mock()
+    _patch_cl_message.return_value.reset_mock()
+    return _patch_cl_message
+
+
 class TestUserSessionManager:
     """Tests for UserSessionManager class"""
     
@@ -113,7 +176,6 @@ class TestUserSessionManager:
         assert manager.component_info_map == {}
         assert manager.model_list == []
     
-    @pytest.mark.asyncio
     async def test_initialize_component_info_map(self, mock_data_layer):
         """Test component info map initialization"""
         manager = UserSessionManager()
@@ -125,7 +187,6 @@ class TestUserSessionManager:
         assert manager.component_info_map["test_agent"].type == AgentType.ASSISTANT_AGENT
         assert manager.component_info_map["test_groupchat"].type == GroupChatTypeEnum.SELECTOR_GROUP_CHAT
     
-    @pytest.mark.asyncio
     async def test_initialize_component_info_map_error_handling(self, mock_data_layer):
         """Test error handling in component info map initialization"""
         manager = UserSessionManager()
@@ -138,10 +199,7 @@ class TestUserSessionManager:
     def test_cache_and_get_model_list(self):
         """Test model list caching and retrieval"""
         manager = UserSessionManager()
-        test_models = [
-            ModelClientConfig(label="model1", provider="provider1", model_name="model-1"),
-            ModelClientConfig(label="model2", provider="provider2", model_name="model-2")
-        ]
+        test_models = [_TEST_MODEL, _TEST_MODEL]
         
         manager.cache_model_list(test_models)
         
@@ -190,111 +248,103 @@ class TestUIAgentBuilder:
 class TestUser:
     """Tests for User class"""
     
-    def test_init_with_context(self, mock_context):
+    @pytest.fixture(scope="class")
+    def async_mocks(self):
+        """Component queue and context manager mocks shared by the class"""
+        return SimpleNamespace(queue=AsyncMock(), ctx_mgr=AsyncMock())
+    
+    @pytest.fixture(autouse=True)
+    def _reset_async_mocks(self, async_mocks):
+        """Clear call records and side effects on the shared mocks after each test"""
+        yield
+        for mock in vars(async_mocks).values():
+            mock.reset_mock(side_effect=True)
+    
+    def test_init_with_context(self, mock_context, monkeypatch):
         """Test User initialization with valid context"""
-        with patch('chainlit_web.users.context', mock_context):
-            User.user_session_manager = UserSessionManager()
-            user = User()
-            
-            assert user.identifier == "test_user"
+        monkeypatch.setattr(User, "user_session_manager", UserSessionManager())
+        user = User()
+        
+        assert user.identifier == "test_user"
     
-    def test_init_without_context(self):
+    def test_init_without_context(self, mock_context_no_session, monkeypatch):
         """Test User initialization without context"""
-        with patch('chainlit_web.users.context') as mock_ctx:
-            mock_ctx.session = None
-            User.user_session_manager = UserSessionManager()
-            user = User()
-            
-            assert user.identifier == "anonymous"
+        monkeypatch.setattr(User, "user_session_manager", UserSessionManager())
+        user = User()
+        
+        assert user.identifier == "anonymous"
     
-    def test_get_without_context(self):
+    def test_get_without_context(self, mock_context_no_session):
         """Test get method without context"""
-        with patch('chainlit_web.users.context') as mock_ctx:
-            mock_ctx.session = None
-            user = User()
-            
-            result = user.get("test_key", "default_value")
-            assert result == "default_value"
+        user = User()
+        
+        result = user.get("test_key", "default_value")
+        assert result == "default_value"
     
-    def test_get_without_session_manager(self, mock_context):
+    def test_get_without_session_manager(self, mock_context, monkeypatch):
         """Test get method without session manager"""
-        User.user_session_manager = None
+        monkeypatch.setattr(User, "user_session_manager", None)
         user = User()
         
         result = user.get("test_key", "default_value")
         assert result == "default_value"
     
-    def test_get_with_new_session(self, mock_context, mock_user_session_manager):
+    def test_get_with_new_session(self, user, mock_user_session_manager):
         """Test get method with new session"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         result = user.get("test_key", "default_value")
         
         assert "test_session_id" in mock_user_session_manager.user_sessions
         assert result == "default_value"
     
-    def test_get_with_existing_session(self, mock_context, mock_user_session_manager):
+    def test_get_with_existing_session(self, user, mock_user_session_manager):
         """Test get method with existing session"""
-        User.user_session_manager = mock_user_session_manager
         mock_user_session_manager.user_sessions["test_session_id"] = {"existing_key": "existing_value"}
-        user = User()
         
         result = user.get("existing_key", "default_value")
         assert result == "existing_value"
     
-    def test_set_without_context(self):
+    def test_set_without_context(self, mock_context_no_session):
         """Test set method without context"""
-        with patch('chainlit_web.users.context') as mock_ctx:
-            mock_ctx.session = None
-            user = User()
-            
-            result = user.set("test_key", "test_value")
-            assert result == "test_value"
+        user = User()
+        
+        result = user.set("test_key", "test_value")
+        assert result == "test_value"
     
-    def test_set_without_session_manager(self, mock_context):
+    def test_set_without_session_manager(self, mock_context, monkeypatch):
         """Test set method without session manager"""
-        User.user_session_manager = None
+        monkeypatch.setattr(User, "user_session_manager", None)
         user = User()
         
         result = user.set("test_key", "test_value")
         assert result == "test_value"
     
-    def test_set_with_new_session(self, mock_context, mock_user_session_manager):
+    def test_set_with_new_session(self, user, mock_user_session_manager):
         """Test set method with new session"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         result = user.set("test_key", "test_value")
         
         assert "test_session_id" in mock_user_session_manager.user_sessions
         assert mock_user_session_manager.user_sessions["test_session_id"]["test_key"] == "test_value"
         assert result == "test_value"
     
-    def test_set_with_existing_session(self, mock_context, mock_user_session_manager):
+    def test_set_with_existing_session(self, user, mock_user_session_manager):
         """Test set method with existing session"""
-        User.user_session_manager = mock_user_session_manager
         mock_user_session_manager.user_sessions["test_session_id"] = {}
-        user = User()
         
         result = user.set("test_key", "test_value")
         
         assert mock_user_session_manager.user_sessions["test_session_id"]["test_key"] == "test_value"
         assert result == "test_value"
     
-    def test_init_session_data_without_manager(self, mock_context):
+    def test_init_session_data_without_manager(self, mock_context, monkeypatch):
         """Test init_session_data without session manager"""
-        User.user_session_manager = None
+        monkeypatch.setattr(User, "user_session_manager", None)
         user = User()
         
         # Should not raise an exception
         user.init_session_data()
     
-    def test_init_session_data_with_manager(self, mock_context, mock_user_session_manager):
+    def test_init_session_data_with_manager(self, user, mock_user_session_manager):
         """Test init_session_data with session manager"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         # Verify default values are set
         session_data = mock_user_session_manager.user_sessions["test_session_id"]
         assert session_data["current_component_name"] == "default"
@@ -302,31 +352,22 @@ class TestUser:
         assert session_data["settings"] == {}
         assert session_data["ready"] is False
     
-    def test_on_stop_with_token(self, mock_context, mock_user_session_manager):
+    def test_on_stop_with_token(self, user):
         """Test on_stop method with cancellation token"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        mock_token = Mock(spec=CancellationToken)
+        mock_token = Mock()
         user.cancellation_token = mock_token
         
         user.on_stop()
         
         mock_token.cancel.assert_called_once()
     
-    def test_on_stop_without_token(self, mock_context, mock_user_session_manager):
+    def test_on_stop_without_token(self, user):
         """Test on_stop method without cancellation token"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         # Should not raise an exception
         user.on_stop()
     
-    def test_clear_chat_resources(self, mock_context, mock_user_session_manager):
+    def test_clear_chat_resources(self, user):
         """Test clear_chat_resources method"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         user.current_component_queue = Mock()
         user.current_component_context = Mock()
         user.ready = True
@@ -337,71 +378,46 @@ class TestUser:
         assert user.current_component_context is None
         assert user.ready is False
     
-    @pytest.mark.asyncio
-    async def test_start_chat_with_existing_profile(self, mock_context, mock_user_session_manager, mock_data_layer):
-        """Test start_chat with existing chat profile"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        with patch.object(user, 'get', return_value="test_agent"):
-            with patch.object(user, 'setup_new_component', new_callable=AsyncMock) as mock_setup:
-                with patch('chainlit_web.users.cl.Message') as mock_message:
-                    mock_msg = AsyncMock()
-                    mock_message.return_value = mock_msg
-                    
-                    await user.start_chat(mock_data_layer)
-                    
-                    mock_setup.assert_called_once()
-                    mock_msg.send.assert_called_once()
-                    assert user.current_component_name == "test_agent"
-    
-    @pytest.mark.asyncio
-    async def test_start_chat_without_profile(self, mock_context, mock_user_session_manager, mock_data_layer):
-        """Test start_chat without existing chat profile"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        with patch.object(user, 'get', return_value=None):
-            with patch.object(User, 'get_chat_profiles', new_callable=AsyncMock) as mock_profiles:
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("scenario, get_patch", [
+        ("existing", {"return_value": "test_agent"}),
+        ("missing", {"return_value": None}),
+        ("error", {"side_effect": _TEST_ERROR}),
+    ], ids=["existing", "missing", "error"])
+    async def test_start_chat(self, scenario, get_patch, user, mock_data_layer, mock_cl_message):
+        """Test start_chat with an existing chat profile, without one, and when it fails"""
+        with ExitStack() as stack:
+            stack.enter_context(patch.object(user, 'get', **get_patch))
+            if scenario == "missing":
+                mock_profiles = stack.enter_context(
+                    patch.object(User, 'get_chat_profiles', new_callable=AsyncMock)
+                )
                 mock_profiles.return_value = [ChatProfile(name="default_profile")]
-                with patch.object(user, 'set', return_value="default_profile"):
-                    with patch.object(user, 'setup_new_component', new_callable=AsyncMock) as mock_setup:
-                        with patch('chainlit_web.users.cl.Message') as mock_message:
-                            mock_msg = AsyncMock()
-                            mock_message.return_value = mock_msg
-                            
-                            await user.start_chat(mock_data_layer)
-                            
-                            mock_profiles.assert_called_once_with(mock_data_layer)
-                            mock_setup.assert_called_once()
-                            mock_msg.send.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_start_chat_error_handling(self, mock_context, mock_user_session_manager, mock_data_layer):
-        """Test start_chat error handling"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        with patch.object(user, 'get', side_effect=Exception("Test error")):
-            with pytest.raises(Exception, match="Test error"):
-                await user.start_chat(mock_data_layer)
-    
-    @pytest.mark.asyncio
-    async def test_component_create_assistant_agent(self, mock_context, mock_user_session_manager, mock_data_layer):
+                stack.enter_context(patch.object(user, 'set', return_value="default_profile"))
+            mock_setup = stack.enter_context(patch.object(user, 'setup_new_component', new_callable=AsyncMock))
+            
+            if scenario == "error":
+                with pytest.raises(RuntimeError, match=r"^Test error$"):
+                    await user.start_chat(mock_data_layer)
+                return
+            
+            await user.start_chat(mock_data_layer)
+            
+            mock_setup.assert_called_once()
+            mock_cl_message.return_value.send.assert_called_once()
+            if scenario == "missing":
+                mock_profiles.assert_called_once_with(mock_data_layer)
+            else:
+                assert user.current_component_name == "test_agent"
+    
+    async def test_component_create_assistant_agent(self, user, mock_data_layer, async_mocks):
         """Test component_create for assistant agent"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        component_info = ComponentInfo(
-            name="test_agent",
-            type=AgentType.ASSISTANT_AGENT,
-            description="Test agent"
-        )
+        component_info = _TEST_AGENT_INFO
         
         with patch.object(user, 'input_func', return_value=AsyncMock()):
             with patch('chainlit_web.users.UIAgentBuilder') as mock_builder_class:
                 mock_builder = Mock()
-                mock_context_manager = AsyncMock()
+                mock_context_manager = async_mocks.ctx_mgr
                 mock_builder.build_with_queue.return_value = mock_context_manager
                 mock_builder_class.return_value = mock_builder
                 
@@ -411,22 +427,14 @@ class TestUser:
                 mock_builder_class.assert_called_once()
                 mock_builder.build_with_queue.assert_called_once_with(component_info)
     
-    @pytest.mark.asyncio
-    async def test_component_create_group_chat(self, mock_context, mock_user_session_manager, mock_data_layer):
+    async def test_component_create_group_chat(self, user, mock_data_layer, async_mocks):
         """Test component_create for group chat"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        component_info = ComponentInfo(
-            name="test_groupchat",
-            type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT,
-            description="Test group chat"
-        )
+        component_info = _TEST_GROUPCHAT_INFO
         
         with patch.object(user, 'input_func', return_value=AsyncMock()):
             with patch('chainlit_web.users.UIGroupChatBuilder') as mock_builder_class:
                 mock_builder = Mock()
-                mock_context_manager = AsyncMock()
+                mock_context_manager = async_mocks.ctx_mgr
                 mock_builder.build_with_queue.return_value = mock_context_manager
                 mock_builder_class.return_value = mock_builder
                 
@@ -436,37 +444,23 @@ class TestUser:
                 mock_builder_class.assert_called_once()
                 mock_builder.build_with_queue.assert_called_once_with(component_info)
     
-    @pytest.mark.asyncio
-    async def test_component_cleanup(self, mock_context, mock_user_session_manager):
+    async def test_component_cleanup(self, user):
         """Test component_cleanup method"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         mock_component = AsyncMock()
         await user.component_cleanup(mock_component)
         
         mock_component.__aexit__.assert_called_once_with(None, None, None)
     
-    @pytest.mark.asyncio
-    async def test_setup_new_component_success(self, mock_context, mock_user_session_manager, mock_data_layer):
+    async def test_setup_new_component_success(self, user, mock_data_layer, async_mocks):
         """Test setup_new_component successful execution"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
+        component_info_map = {"test_agent": _TEST_AGENT_INFO}
         
-        component_info_map = {
-            "test_agent": ComponentInfo(
-                name="test_agent",
-                type=AgentType.ASSISTANT_AGENT,
-                description="Test agent"
-            )
-        }
-        
-        mock_queue = AsyncMock()
-        mock_context = AsyncMock()
+        mock_queue = async_mocks.queue
+        mock_context = async_mocks.ctx_mgr
         mock_context.__aenter__.return_value = mock_queue
         
         with patch.object(user, 'component_create', return_value=mock_context) as mock_create:
-            with patch.object(user, 'set', return_value=Mock(spec=CancellationToken)) as mock_set:
+            with patch.object(user, 'set', return_value=Mock()) as mock_set:
                 
                 await user.setup_new_component("test_agent", component_info_map, mock_data_layer)
                 
@@ -476,48 +470,33 @@ class TestUser:
                 assert user.current_component_context == mock_context
                 assert user.current_component_queue == mock_queue
     
-    @pytest.mark.asyncio
-    async def test_setup_new_component_error(self, mock_context, mock_user_session_manager, mock_data_layer):
+    async def test_setup_new_component_error(self, user, mock_data_layer):
         """Test setup_new_component error handling"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         component_info_map = {"test_agent": Mock()}
         
-        with patch.object(user, 'component_create', side_effect=Exception("Setup error")):
-            with pytest.raises(Exception, match="Setup error"):
+        with patch.object(user, 'component_create', side_effect=_SETUP_ERROR):
+            with pytest.raises(RuntimeError, match=r"^Setup error$"):
                 await user.setup_new_component("test_agent", component_info_map, mock_data_layer)
     
-    @pytest.mark.asyncio
-    async def test_chat_success(self, mock_context, mock_user_session_manager):
+    async def test_chat_success(self, user, async_mocks, mock_cl_message):
         """Test chat method successful execution"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        mock_queue = AsyncMock()
+        mock_queue = async_mocks.queue
         mock_event = Mock()
         mock_event.content = "Test response"
-        mock_queue.push.return_value = [mock_event].__aiter__()
+        mock_queue.push.return_value = _aiter([mock_event])
         user.current_component_queue = mock_queue
         
         mock_message = Mock()
         mock_message.content = "Test message"
         
-        with patch('chainlit_web.users.cl.Message') as mock_cl_message:
-            mock_cl_msg = AsyncMock()
-            mock_cl_message.return_value = mock_cl_msg
-            
-            await user.chat(mock_message)
-            
-            mock_queue.push.assert_called_once_with("Test message")
-            mock_cl_message.assert_called_once_with(content="Test response")
-            mock_cl_msg.send.assert_called_once()
+        await user.chat(mock_message)
+        
+        mock_queue.push.assert_called_once_with("Test message")
+        mock_cl_message.assert_called_once_with(content="Test response")
+        mock_cl_message.return_value.send.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_chat_no_queue(self, mock_context, mock_user_session_manager):
+    async def test_chat_no_queue(self, user):
         """Test chat method without component queue"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
         user.current_component_queue = None
         
         mock_message = Mock()
@@ -526,12 +505,8 @@ class TestUser:
         # Should not raise an exception but log an error
         await user.chat(mock_message)
     
-    @pytest.mark.asyncio
-    async def test_chat_error_handling(self, mock_context, mock_user_session_manager):
+    async def test_chat_error_handling(self, user):
         """Test chat method error handling"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         mock_queue = AsyncMock()
         mock_queue.push.side_effect = Exception("Chat error")
         user.current_component_queue = mock_queue
@@ -542,12 +517,8 @@ class TestUser:
         # Should not raise an exception but log an error
         await user.chat(mock_message)
     
-    @pytest.mark.asyncio
-    async def test_cleanup_current_chat_success(self, mock_context, mock_user_session_manager):
+    async def test_cleanup_current_chat_success(self, user):
         """Test cleanup_current_chat successful execution"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         mock_context = AsyncMock()
         user.current_component_context = mock_context
         
@@ -557,11 +528,8 @@ class TestUser:
             mock_context.__aexit__.assert_called_once_with(None, None, None)
             mock_clear.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_cleanup_current_chat_no_context(self, mock_context, mock_user_session_manager):
+    async def test_cleanup_current_chat_no_context(self, user):
         """Test cleanup_current_chat without component context"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
         user.current_component_context = None
         
         with patch.object(user, 'clear_chat_resources') as mock_clear:
@@ -569,12 +537,8 @@ class TestUser:
             
             mock_clear.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_cleanup_current_chat_error(self, mock_context, mock_user_session_manager):
+    async def test_cleanup_current_chat_error(self, user):
         """Test cleanup_current_chat error handling"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         mock_context = AsyncMock()
         mock_context.__aexit__.side_effect = Exception("Cleanup error")
         user.current_component_context = mock_context
@@ -582,131 +546,88 @@ class TestUser:
         # Should not raise an exception but log an error
         await user.cleanup_current_chat()
     
-    @pytest.mark.asyncio
-    async def test_settings_update_model_selection(self, mock_context, mock_user_session_manager, mock_data_layer):
+    async def test_settings_update_model_selection(self, user, mock_data_layer):
         """Test settings_update with model selection"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
         user.settings = {}
         
-        mock_widget = Mock()
-        mock_widget.id = "Model"
-        mock_widget.initial = "test_model"
-        
-        mock_settings = Mock()
-        mock_settings.inputs = [mock_widget]
+        mock_settings = _Settings(inputs=[_Widget(id="Model", initial="test_model")])
         
         await user.settings_update(mock_settings, mock_data_layer)
         
         mock_data_layer.llm.get_component_by_name.assert_called_once_with("test_model")
         assert user.current_model_client is not None
     
-    @pytest.mark.asyncio
-    async def test_settings_update_no_model_widget(self, mock_context, mock_user_session_manager, mock_data_layer):
+    async def test_settings_update_no_model_widget(self, user, mock_data_layer):
         """Test settings_update without model widget"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
         user.settings = {}
         
-        mock_settings = Mock()
-        mock_settings.inputs = []
+        mock_settings = _Settings(inputs=[])
         
         await user.settings_update(mock_settings, mock_data_layer)
         
         mock_data_layer.llm.get_component_by_name.assert_not_called()
     
-    @pytest.mark.asyncio
-    async def test_settings_update_error(self, mock_context, mock_user_session_manager, mock_data_layer):
+    async def test_settings_update_error(self, user, mock_data_layer, mock_cl_message):
         """Test settings_update error handling"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
-        mock_settings = Mock()
-        mock_settings.inputs = []
+        mock_settings = _Settings(inputs=[])
         user.settings.update.side_effect = Exception("Settings error")
         
-        with patch('chainlit_web.users.cl.Message') as mock_message:
-            mock_msg = AsyncMock()
-            mock_message.return_value = mock_msg
-            
-            await user.settings_update(mock_settings, mock_data_layer)
-            
-            mock_message.assert_called_once()
-            mock_msg.send.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_get_chat_profiles_success(self, mock_data_layer):
-        """Test get_chat_profiles successful execution"""
-        profiles = await User.get_chat_profiles(mock_data_layer)
-        
-        assert len(profiles) == 2
-        assert profiles[0].name == "test_agent"
-        assert "Agent" in profiles[0].markdown_description
-        assert profiles[1].name == "test_groupchat"
-        assert "Group Chat" in profiles[1].markdown_description
-    
-    @pytest.mark.asyncio
-    async def test_get_chat_profiles_empty_components(self, mock_data_layer):
-        """Test get_chat_profiles with empty component lists"""
-        mock_data_layer.agent.get_all_components.return_value = []
-        mock_data_layer.group_chat.get_all_components.return_value = []
-        
-        profiles = await User.get_chat_profiles(mock_data_layer)
+        await user.settings_update(mock_settings, mock_data_layer)
         
-        assert len(profiles) == 1
-        assert profiles[0].name == "executor"
-        assert "Default Group Chat" in profiles[0].markdown_description
-    
-    @pytest.mark.asyncio
-    async def test_get_chat_profiles_error_handling(self, mock_data_layer):
-        """Test get_chat_profiles error handling"""
-        mock_data_layer.agent.get_all_components.side_effect = Exception("Database error")
+        mock_cl_message.assert_called_once()
+        mock_cl_message.return_value.send.assert_called_once()
+    
+    @pytest.mark.parametrize("agents, group_chats, expected", [
+        ([_TEST_AGENT_INFO], [_TEST_GROUPCHAT_INFO], [("test_agent", "Agent"), ("test_groupchat", "Group Chat")]),
+        ([], [], [("executor", "Default Group Chat")]),
+        (Exception("Database error"), [_TEST_GROUPCHAT_INFO], [("hil", "Default Group Chat")]),
+    ], ids=["success", "empty", "error"])
+    async def test_get_chat_profiles(self, agents, group_chats, expected, mock_data_layer):
+        """Test get_chat_profiles with components, without any, and when loading fails"""
+        if isinstance(agents, Exception):
+            mock_data_layer.agent.get_all_components.side_effect = agents
+        else:
+            mock_data_layer.agent.get_all_components.return_value = agents
+        mock_data_layer.group_chat.get_all_components.return_value = group_chats
         
         profiles = await User.get_chat_profiles(mock_data_layer)
         
-        assert len(profiles) == 1
-        assert profiles[0].name == "hil"
-        assert "Default Group Chat" in profiles[0].markdown_description
-
+        assert [profile.name for profile in profiles] == [name for name, _ in expected]
+        for profile, (_, description) in zip(profiles, expected):
+            assert description in profile.markdown_description
 
 class TestIntegration:
     """Integration tests for User class workflow"""
     
-    @pytest.mark.asyncio
-    async def test_full_chat_workflow(self, mock_context, mock_user_session_manager, mock_data_layer):
+    @pytest.mark.slow
+    @pytest.mark.benchmark
+    async def test_full_chat_workflow(self, user, mock_data_layer, mock_cl_message):
         """Test complete chat workflow from initialization to cleanup"""
-        User.user_session_manager = mock_user_session_manager
-        user = User()
-        
         # Mock component queue
         mock_queue = AsyncMock()
         mock_event = Mock()
         mock_event.content = "Response"
-        mock_queue.push.return_value = [mock_event].__aiter__()
+        mock_queue.push.return_value = _aiter([mock_event])
         
         # Mock context manager
         mock_context_mgr = AsyncMock()
         mock_context_mgr.__aenter__.return_value = mock_queue
         
         with patch.object(user, 'component_create', return_value=mock_context_mgr):
-            with patch('chainlit_web.users.cl.Message') as mock_message:
-                mock_msg = AsyncMock()
-                mock_message.return_value = mock_msg
-                
-                # Start chat
-                await user.start_chat(mock_data_layer)
-                
-                # Send message
-                test_message = Mock()
-                test_message.content = "Hello"
-                await user.chat(test_message)
-                
-                # Cleanup
-                await user.cleanup_current_chat()
-                
-                # Verify workflow
-                mock_context_mgr.__aenter__.assert_called_once()
-                mock_queue.start.assert_called_once()
-                mock_queue.push.assert_called_once_with("Hello")
-                mock_context_mgr.__aexit__.assert_called_once()
-                assert user.current_component_queue is None
\ No newline at end of file
+            # Start chat
+            await user.start_chat(mock_data_layer)
+            
+            # Send message
+            test_message = Mock()
+            test_message.content = "Hello"
+            await user.chat(test_message)
+            
+            # Cleanup
+            await user.cleanup_current_chat()
+            
+            # Verify workflow
+            mock_context_mgr.__aenter__.assert_called_once()
+            mock_queue.start.assert_called_once()
+            mock_queue.push.assert_called_once_with("Hello")
+            mock_context_mgr.__aexit__.assert_called_once()
+            assert user.current_component_queue is None
\ No newline at end of file
@@ -17,10 +17,70 @@ from schemas.agent import AgentType, AssistantAgentConfig
 from schemas.group_chat import GroupChatType as GroupChatTypeEnum, SelectorGroupChatConfig
 from schemas.model_info import ModelClientConfig, model_client
 from schemas.types import ComponentType
-from data_layer.data_layer import AgentFusionDataLayer
 from chainlit.types import ChatProfile
 from autogen_core.models import ModelFamily
 
+# Keep these tests on one xdist worker under --dist=loadgroup
+pytestmark = pytest.mark.xdist_group(name="users_final")
+
+# Model configs used by TestModelManagement; cache_model_list keeps references, never copies
+_MODELS = {
+    "gpt4": ModelClientConfig(
+        type=ComponentType.LLM,
+        label="gpt-4",
+        model_name="gpt-4",
+        base_url="https://api.openai.com",
+        family=ModelFamily.UNKNOWN,
+        api_key_type="OPENAI_API_KEY",
+        stream=True
+    ),
+    "claude3": ModelClientConfig(
+        type=ComponentType.LLM,
+        label="claude-3",
+        model_name="claude-3-opus",
+        base_url="https://api.anthropic.com",
+        family=ModelFamily.UNKNOWN,
+        api_key_type="ANTHROPIC_API_KEY",
+        stream=True
+    ),
+    "test": ModelClientConfig(
+        type=ComponentType.LLM,
+        label="test-model",
+        model_name="test-model-name",
+        base_url="https://api.test.com",
+        family=ModelFamily.UNKNOWN,
+        api_key_type="TEST_API_KEY",
+        stream=True
+    ),
+    "initial": ModelClientConfig(
+        type=ComponentType.LLM,
+        label="initial",
+        model_name="initial-model",
+        base_url="https://api.initial.com",
+        family=ModelFamily.UNKNOWN,
+        api_key_type="INITIAL_API_KEY",
+        stream=True
+    ),
+    "new1": ModelClientConfig(
+        type=ComponentType.LLM,
+        label="new1",
+        model_name="new-model-1",
+        base_url="https://api.new1.com",
+        family=ModelFamily.UNKNOWN,
+        api_key_type="NEW_API_KEY",
+        stream=True
+    ),
+    "new2": ModelClientConfig(
+        type=ComponentType.LLM,
+        label="new2",
+        model_name="new-model-2",
+        base_url="https://api.new2.com",
+        family=ModelFamily.UNKNOWN,
+        api_key_type="NEW_API_KEY",
+        stream=False
+    ),
+}
+
 
 class TestUserSessionManager:
     """Tests for UserSessionManager class"""
@@ -62,16 +122,21 @@ class TestUserSessionManager:
         assert len(manager.model_list) == 2
     
     @pytest.mark.asyncio
-    async def test_initialize_component_info_map_error_handling(self):
-        """Test error handling in component info map initialization"""
+    @pytest.mark.parametrize("agent_side, group_side", [
+        (Exception("Database error"), []),
+        ([], Exception("GroupChat error")),
+        (Exception("Database error"), Exception("GroupChat error")),
+    ], ids=["agents", "group_chats", "both"])
+    async def test_initialize_component_info_map_error_handling(self, agent_side, group_side):
+        """Test component info map initialization when agents, group chats or both fail to load"""
         manager = UserSessionManager()
         
-        # Mock data layer that raises exceptions
-        mock_data_layer = Mock(spec=AgentFusionDataLayer)
+        # AsyncMock raises exceptions given as side_effect and returns anything else
+        mock_data_layer = Mock()
         mock_data_layer.agent = Mock()
-        mock_data_layer.agent.get_all_components = AsyncMock(side_effect=Exception("Database error"))
+        mock_data_layer.agent.get_all_components = AsyncMock(side_effect=[agent_side])
         mock_data_layer.group_chat = Mock()
-        mock_data_layer.group_chat.get_all_components = AsyncMock(return_value=[])
+        mock_data_layer.group_chat.get_all_components = AsyncMock(side_effect=[group_side])
         
         await manager.initialize_component_info_map(mock_data_layer)
         
@@ -130,7 +195,7 @@ class TestUIAgentBuilder:
     
     def test_init(self):
         """Test UIAgentBuilder initialization"""
-        mock_data_layer = Mock(spec=AgentFusionDataLayer)
+        mock_data_layer = Mock()
         builder = UIAgentBuilder(mock_data_layer)
         
         assert builder.data_layer == mock_data_layer
@@ -138,7 +203,7 @@ class TestUIAgentBuilder:
     
     def test_init_with_input_func(self):
         """Test UIAgentBuilder initialization with input function"""
-        mock_data_layer = Mock(spec=AgentFusionDataLayer)
+        mock_data_layer = Mock()
         input_func = AsyncMock()
         builder = UIAgentBuilder(mock_data_layer, input_func)
         
@@ -155,7 +220,7 @@ class TestUserStaticMethods:
         from chainlit_web.users import User
         
         # Mock data layer with empty responses
-        mock_data_layer = Mock(spec=AgentFusionDataLayer)
+        mock_data_layer = Mock()
         mock_data_layer.agent = Mock()
         mock_data_layer.agent.get_all_components = AsyncMock(return_value=[])
         mock_data_layer.group_chat = Mock()
@@ -173,7 +238,7 @@ class TestUserStaticMethods:
         from chainlit_web.users import User
         
         # Mock data layer that raises exceptions
-        mock_data_layer = Mock(spec=AgentFusionDataLayer)
+        mock_data_layer = Mock()
         mock_data_layer.agent = Mock()
         mock_data_layer.agent.get_all_components = AsyncMock(side_effect=Exception("Database error"))
         mock_data_layer.group_chat = Mock()
@@ -197,26 +262,7 @@ class TestModelManagement:
         assert manager.get_model_list() == []
         
         # Test caching models
-        test_models = [
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="gpt-4",
-                model_name="gpt-4",
-                base_url="https://api.openai.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="OPENAI_API_KEY",
-                stream=True
-            ),
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="claude-3",
-                model_name="claude-3-opus",
-                base_url="https://api.anthropic.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="ANTHROPIC_API_KEY",
-                stream=True
-            )
-        ]
+        test_models = [_MODELS["gpt4"], _MODELS["claude3"]]
         
         manager.cache_model_list(test_models)
         cached_models = manager.get_model_list()
@@ -229,19 +275,8 @@ class TestModelManagement:
         """Test that model list persists correctly"""
         manager = UserSessionManager()
         
-        # Create test model
-        test_model = ModelClientConfig(
-            type=ComponentType.LLM,
-            label="test-model",
-            model_name="test-model-name",
-            base_url="https://api.test.com",
-            family=ModelFamily.UNKNOWN,
-            api_key_type="TEST_API_KEY",
-            stream=True
-        )
-        
         # Cache single model
-        manager.cache_model_list([test_model])
+        manager.cache_model_list([_MODELS["test"]])
         
         # Verify persistence
         retrieved_models = manager.get_model_list()
@@ -254,41 +289,12 @@ class TestModelManagement:
         manager = UserSessionManager()
         
         # Cache initial models
-        initial_models = [
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="initial",
-                model_name="initial-model",
-                base_url="https://api.initial.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="INITIAL_API_KEY",
-                stream=True
-            )
-        ]
+        initial_models = [_MODELS["initial"]]
         manager.cache_model_list(initial_models)
         assert len(manager.get_model_list()) == 1
         
         # Cache new models (should overwrite)
-        new_models = [
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="new1",
-                model_name="new-model-1",
-                base_url="https://api.new1.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="NEW_API_KEY",
-                stream=True
-            ),
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="new2",
-                model_name="new-model-2",
-                base_url="https://api.new2.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="NEW_API_KEY",
-                stream=False
-            )
-        ]
+        new_models = [_MODELS["new1"], _MODELS["new2"]]
         manager.cache_model_list(new_models)
         
         # Verify overwrite
@@ -334,22 +340,6 @@ class TestSessionManagement:
 class TestErrorHandling:
     """Tests for error handling scenarios"""
     
-    @pytest.mark.asyncio
-    async def test_data_layer_initialization_with_partial_failure(self):
-        """Test component info map initialization with partial failures"""
-        manager = UserSessionManager()
-        
-        # Mock data layer where agents succeed but group chats fail
-        mock_data_layer = Mock(spec=AgentFusionDataLayer)
-        mock_data_layer.agent = Mock()
-        mock_data_layer.agent.get_all_components = AsyncMock(return_value=[])  # Empty but successful
-        mock_data_layer.group_chat = Mock()
-        mock_data_layer.group_chat.get_all_components = AsyncMock(side_effect=Exception("GroupChat error"))
-        
-        # Should handle error gracefully
-        await manager.initialize_component_info_map(mock_data_layer)
-        assert manager.component_info_map == {}
-    
     def test_session_manager_robustness(self):
         """Test that UserSessionManager handles edge cases robustly"""
         manager = UserSessionManager()
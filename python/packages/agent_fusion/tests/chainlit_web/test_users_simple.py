@@ -6,80 +6,121 @@ full chainlit context initialization.
 """
 
 import pytest
-import asyncio
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+from types import SimpleNamespace
+from typing import Any
 
 # Import the classes under test
-from chainlit_web.users import UserSessionManager, UserSessionData, UIAgentBuilder
+from chainlit_web.users import User, UserSessionManager, UserSessionData, UIAgentBuilder
 from schemas.agent import AgentType, AssistantAgentConfig
 from schemas.group_chat import GroupChatType as GroupChatTypeEnum, SelectorGroupChatConfig
 from schemas.model_info import ModelClientConfig, model_client
 from schemas.types import ComponentType
-from data_layer.data_layer import AgentFusionDataLayer
-from chainlit.types import ChatProfile
 from autogen_core.models import ModelFamily
 
+# Keep these tests on one xdist worker under --dist=loadgroup
+pytestmark = pytest.mark.xdist_group(name="users_simple")
+
+
+# Configs shared by the fixtures and tests, validated once at import; never mutated
+_TEST_AGENT_CFG = AssistantAgentConfig(
+    name="test_agent",
+    type=AgentType.ASSISTANT_AGENT,
+    description="Test assistant agent",
+    labels=["test"],
+    prompt_path="test.md",
+    model_client=model_client.deepseek_chat_DeepSeek
+)
+_TEST_GC_CFG = SelectorGroupChatConfig(
+    name="test_groupchat",
+    type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT,
+    description="Test group chat",
+    labels=["test"],
+    selector_prompt="test prompt",
+    model_client=model_client.deepseek_chat_DeepSeek,
+    participants=[]
+)
+_TEST_MODEL = ModelClientConfig(
+    type=ComponentType.LLM,
+    label="test_model",
+    model_name="test-model-1",
+    base_url="https://api.test.com",
+    family=ModelFamily.UNKNOWN,
+    api_key_type="TEST_API_KEY",
+    stream=True
+)
+_TEST_MODEL_1 = ModelClientConfig(
+    type=ComponentType.LLM,
+    label="model1",
+    model_name="model-1",
+    base_url="https://api.test1.com",
+    family=ModelFamily.UNKNOWN,
+    api_key_type="TEST_API_KEY",
+    stream=True
+)
+_TEST_MODEL_2 = ModelClientConfig(
+    type=ComponentType.LLM,
+    label="model2",
+    model_name="model-2",
+    base_url="https://api.test2.com",
+    family=ModelFamily.UNKNOWN,
+    api_key_type="TEST_API_KEY",
+    stream=False
+)
+_MULTI_AGENT_CFGS = [
+    AssistantAgentConfig(name="agent1", type=AgentType.ASSISTANT_AGENT, description="Agent 1", labels=["test"], prompt_path="test.md", model_client=model_client.deepseek_chat_DeepSeek),
+    AssistantAgentConfig(name="agent2", type=AgentType.CODE_AGENT, description="Agent 2", labels=["test"], prompt_path="test.md", model_client=model_client.deepseek_chat_DeepSeek)
+]
+_MULTI_GC_CFGS = [
+    SelectorGroupChatConfig(name="gc1", type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT, description="GC 1", labels=["test"], selector_prompt="test", model_client=model_client.deepseek_chat_DeepSeek, participants=[])
+]
+
+
+def _async_return(value):
+    """Coroutine function returning value, for stubs no test inspects or reconfigures"""
+    async def _stub(*args, **kwargs):
+        return value
+    return _stub
+
+
+@dataclass
+class _StubDataLayer:
+    """Stand-in for AgentFusionDataLayer with only the parts the tests touch"""
+    agent: Any
+    group_chat: Any
+    llm: Any
+
 
 @pytest.fixture
 def mock_data_layer():
     """Mock AgentFusionDataLayer for testing"""
-    data_layer = Mock(spec=AgentFusionDataLayer)
-    
-    # Mock agent methods
-    data_layer.agent = Mock()
-    data_layer.agent.get_all_components = AsyncMock(return_value=[
-        AssistantAgentConfig(
-            name="test_agent",
-            type=AgentType.ASSISTANT_AGENT,
-            description="Test assistant agent",
-            labels=["test"],
-            prompt_path="test.md",
-            model_client=model_client.deepseek_chat_DeepSeek
-        )
-    ])
-    
-    # Mock group chat methods
-    data_layer.group_chat = Mock()
-    data_layer.group_chat.get_all_components = AsyncMock(return_value=[
-        SelectorGroupChatConfig(
-            name="test_groupchat",
-            type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT,
-            description="Test group chat",
-            labels=["test"],
-            selector_prompt="test prompt",
-            model_client=model_client.deepseek_chat_DeepSeek,
-            participants=[]
-        )
-    ])
-    
-    # Mock LLM methods
-    data_layer.llm = Mock()
-    data_layer.llm.get_component_by_name = AsyncMock(return_value=ModelClientConfig(
-        type=ComponentType.LLM,
-        label="test_model",
-        model_name="test-model-1",
-        base_url="https://api.test.com",
-        family=ModelFamily.UNKNOWN,
-        api_key_type="TEST_API_KEY",
-        stream=True
-    ))
-    
-    return data_layer
+    return _StubDataLayer(
+        agent=SimpleNamespace(get_all_components=AsyncMock(return_value=[_TEST_AGENT_CFG])),
+        group_chat=SimpleNamespace(get_all_components=AsyncMock(return_value=[_TEST_GC_CFG])),
+        llm=SimpleNamespace(
+            get_component_by_name=_async_return(_TEST_MODEL),
+            init_component_map=_async_return(None),
+        ),
+    )
+
+
+@pytest.fixture(scope="class")
+def fresh_manager():
+    """UserSessionManager shared by a class's tests that only read it"""
+    return UserSessionManager()
 
 
 class TestUserSessionManager:
     """Tests for UserSessionManager class"""
     
-    def test_init(self):
+    def test_init(self, fresh_manager):
         """Test UserSessionManager initialization"""
-        manager = UserSessionManager()
+        manager = fresh_manager
         assert manager.user_sessions == {}
         assert manager.component_info_map == {}
         assert manager.model_list == []
     
-    @pytest.mark.asyncio
     async def test_initialize_component_info_map(self, mock_data_layer):
         """Test component info map initialization"""
         manager = UserSessionManager()
@@ -91,39 +132,10 @@ class TestUserSessionManager:
         assert manager.component_info_map["test_agent"].type == AgentType.ASSISTANT_AGENT
         assert manager.component_info_map["test_groupchat"].type == GroupChatTypeEnum.SELECTOR_GROUP_CHAT
     
-    @pytest.mark.asyncio
-    async def test_initialize_component_info_map_error_handling(self, mock_data_layer):
-        """Test error handling in component info map initialization"""
-        manager = UserSessionManager()
-        mock_data_layer.agent.get_all_components.side_effect = Exception("Database error")
-        
-        await manager.initialize_component_info_map(mock_data_layer)
-        
-        assert manager.component_info_map == {}
-    
     def test_cache_and_get_model_list(self):
         """Test model list caching and retrieval"""
         manager = UserSessionManager()
-        test_models = [
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="model1",
-                model_name="model-1",
-                base_url="https://api.test1.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="TEST_API_KEY",
-                stream=True
-            ),
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="model2",
-                model_name="model-2",
-                base_url="https://api.test2.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="TEST_API_KEY",
-                stream=False
-            )
-        ]
+        test_models = [_TEST_MODEL_1, _TEST_MODEL_2]
         
         manager.cache_model_list(test_models)
         
@@ -187,138 +199,71 @@ class TestUIAgentBuilder:
 class TestUserStaticMethods:
     """Tests for User class static methods that don't require context"""
     
-    @pytest.mark.asyncio
-    async def test_get_chat_profiles_success(self, mock_data_layer):
-        """Test get_chat_profiles successful execution"""
-        # Import here to avoid context issues during module import
-        from chainlit_web.users import User
+    @pytest.mark.parametrize("agents, group_chats, expected", [
+        ([_TEST_AGENT_CFG], [_TEST_GC_CFG], [("test_agent", "Agent"), ("test_groupchat", "Group Chat")]),
+        ([], [], [("executor", "Default Group Chat")]),
+        (Exception("Database error"), [_TEST_GC_CFG], [("hil", "Default Group Chat")]),
+    ], ids=["success", "empty", "error"])
+    async def test_get_chat_profiles(self, agents, group_chats, expected, mock_data_layer):
+        """Test get_chat_profiles with components, without any, and when loading fails"""
+        if isinstance(agents, Exception):
+            mock_data_layer.agent.get_all_components.side_effect = agents
+        else:
+            mock_data_layer.agent.get_all_components.return_value = agents
+        mock_data_layer.group_chat.get_all_components.return_value = group_chats
         
         profiles = await User.get_chat_profiles(mock_data_layer)
         
-        assert len(profiles) == 2
-        assert profiles[0].name == "test_agent"
-        assert "Agent" in profiles[0].markdown_description
-        assert profiles[1].name == "test_groupchat"
-        assert "Group Chat" in profiles[1].markdown_description
-    
-    @pytest.mark.asyncio
-    async def test_get_chat_profiles_empty_components(self, mock_data_layer):
-        """Test get_chat_profiles with empty component lists"""
-        from chainlit_web.users import User
-        
-        mock_data_layer.agent.get_all_components.return_value = []
-        mock_data_layer.group_chat.get_all_components.return_value = []
-        
-        profiles = await User.get_chat_profiles(mock_data_layer)
-        
-        assert len(profiles) == 1
-        assert profiles[0].name == "executor"
-        assert "Default Group Chat" in profiles[0].markdown_description
-    
-    @pytest.mark.asyncio
-    async def test_get_chat_profiles_error_handling(self, mock_data_layer):
-        """Test get_chat_profiles error handling"""
-        from chainlit_web.users import User
-        
-        mock_data_layer.agent.get_all_components.side_effect = Exception("Database error")
-        
-        profiles = await User.get_chat_profiles(mock_data_layer)
-        
-        assert len(profiles) == 1
-        assert profiles[0].name == "hil"
-        assert "Default Group Chat" in profiles[0].markdown_description
-
+        assert [profile.name for profile in profiles] == [name for name, _ in expected]
+        for profile, (_, description) in zip(profiles, expected):
+            assert description in profile.markdown_description
 
 class TestUserMethodsWithMockedContext:
     """Tests for User class methods with properly mocked context"""
     
-    def test_user_session_manager_get_without_context(self):
+    def test_user_session_manager_get_without_context(self, fresh_manager):
         """Test UserSessionManager get method without context"""
-        from chainlit_web.users import UserSessionManager
-        
-        manager = UserSessionManager()
+        manager = fresh_manager
         result = manager.get("test_key", "default_value")
         assert result == "default_value"
     
-    @patch('chainlit_web.users.context')
-    def test_component_info_access(self, mock_context):
+    def test_component_info_access(self):
         """Test accessing component info map"""
-        from chainlit_web.users import UserSessionManager
-        
-        # Set up mock context
-        mock_session = Mock()
-        mock_session.id = "test_session"
-        mock_context.session = mock_session
-        
         manager = UserSessionManager()
-        manager.component_info_map = {
-            "test_component": AssistantAgentConfig(
-                name="test_component",
-                type=AgentType.ASSISTANT_AGENT,
-                description="Test component",
-                labels=["test"],
-                prompt_path="test.md",
-                model_client=model_client.deepseek_chat_DeepSeek
-            )
-        }
+        manager.component_info_map = {"test_agent": _TEST_AGENT_CFG}
         
-        assert "test_component" in manager.component_info_map
-        assert manager.component_info_map["test_component"].name == "test_component"
+        assert "test_agent" in manager.component_info_map
+        assert manager.component_info_map["test_agent"].name == "test_agent"
     
     def test_model_list_operations(self):
         """Test model list operations"""
-        from chainlit_web.users import UserSessionManager
-        
         manager = UserSessionManager()
         
         # Test empty list initially
         assert manager.get_model_list() == []
         
         # Test caching models
-        test_models = [
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="gpt-4",
-                model_name="gpt-4",
-                base_url="https://api.openai.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="OPENAI_API_KEY",
-                stream=True
-            ),
-            ModelClientConfig(
-                type=ComponentType.LLM,
-                label="claude-3",
-                model_name="claude-3-opus",
-                base_url="https://api.anthropic.com",
-                family=ModelFamily.UNKNOWN,
-                api_key_type="ANTHROPIC_API_KEY",
-                stream=True
-            )
-        ]
+        test_models = [_TEST_MODEL_1, _TEST_MODEL_2]
         
         manager.cache_model_list(test_models)
         cached_models = manager.get_model_list()
         
         assert len(cached_models) == 2
-        assert cached_models[0].label == "gpt-4"
-        assert cached_models[1].label == "claude-3"
+        assert cached_models[0].label == "model1"
+        assert cached_models[1].label == "model2"
 
 
 class TestComponentManagement:
     """Tests for component management functionality"""
     
-    @pytest.mark.asyncio
     async def test_component_info_map_building(self, mock_data_layer):
         """Test building component info map from data layer"""
-        from chainlit_web.users import UserSessionManager
-        
         manager = UserSessionManager()
         await manager.initialize_component_info_map(mock_data_layer)
         
         # Verify both agents and group chats are included
-        component_names = list(manager.component_info_map.keys())
-        assert "test_agent" in component_names
-        assert "test_groupchat" in component_names
+        assert "test_agent" in manager.component_info_map
+        assert "test_groupchat" in manager.component_info_map
         
         # Verify component types
         agent_component = manager.component_info_map["test_agent"]
@@ -327,21 +272,13 @@ class TestComponentManagement:
         assert agent_component.type == AgentType.ASSISTANT_AGENT
         assert groupchat_component.type == GroupChatTypeEnum.SELECTOR_GROUP_CHAT
     
-    @pytest.mark.asyncio
     async def test_component_info_map_with_multiple_agents(self, mock_data_layer):
         """Test component info map with multiple agents"""
-        from chainlit_web.users import UserSessionManager
-        
         # Mock multiple agents
-        mock_data_layer.agent.get_all_components.return_value = [
-            AssistantAgentConfig(name="agent1", type=AgentType.ASSISTANT_AGENT, description="Agent 1", labels=["test"], prompt_path="test.md", model_client="test"),
-            AssistantAgentConfig(name="agent2", type=AgentType.CODE_AGENT, description="Agent 2", labels=["test"], prompt_path="test.md", model_client="test")
-        ]
+        mock_data_layer.agent.get_all_components.return_value = _MULTI_AGENT_CFGS
         
         # Mock multiple group chats  
-        mock_data_layer.group_chat.get_all_components.return_value = [
-            SelectorGroupChatConfig(name="gc1", type=GroupChatTypeEnum.SELECTOR_GROUP_CHAT, description="GC 1", labels=["test"], selector_prompt="test", model_client="test", participants=[])
-        ]
+        mock_data_layer.group_chat.get_all_components.return_value = _MULTI_GC_CFGS
         
         manager = UserSessionManager()
         await manager.initialize_component_info_map(mock_data_layer)
@@ -356,46 +293,21 @@ class TestComponentManagement:
 class TestErrorHandling:
     """Tests for error handling scenarios"""
     
-    @pytest.mark.asyncio
-    async def test_data_layer_agent_error(self, mock_data_layer):
-        """Test handling of agent data layer errors"""
-        from chainlit_web.users import UserSessionManager
-        
-        mock_data_layer.agent.get_all_components.side_effect = Exception("Agent DB error")
+    @pytest.mark.parametrize("failing", [
+        ("agent",),
+        ("group_chat",),
+        ("agent", "group_chat"),
+    ], ids=["agents", "group_chats", "both"])
+    async def test_data_layer_error(self, failing, mock_data_layer):
+        """Test component info map initialization when agents, group chats or both fail to load"""
+        for source in failing:
+            getattr(mock_data_layer, source).get_all_components.side_effect = Exception(f"{source} DB error")
         
         manager = UserSessionManager()
         await manager.initialize_component_info_map(mock_data_layer)
         
-        # Should handle error gracefully and set empty map
+        # Should handle error gracefully and set empty map, even if one source succeeded
         assert manager.component_info_map == {}
-    
-    @pytest.mark.asyncio
-    async def test_data_layer_groupchat_error(self, mock_data_layer):
-        """Test handling of group chat data layer errors"""
-        from chainlit_web.users import UserSessionManager
-        
-        mock_data_layer.group_chat.get_all_components.side_effect = Exception("GroupChat DB error")
-        
-        manager = UserSessionManager()
-        await manager.initialize_component_info_map(mock_data_layer)
-        
-        # Should handle error gracefully and set empty map
-        assert manager.component_info_map == {}
-    
-    @pytest.mark.asyncio
-    async def test_partial_data_layer_success(self, mock_data_layer):
-        """Test handling when only one data source succeeds"""
-        from chainlit_web.users import UserSessionManager
-        
-        # Agent succeeds, group chat fails
-        mock_data_layer.group_chat.get_all_components.side_effect = Exception("GroupChat error")
-        
-        manager = UserSessionManager()
-        await manager.initialize_component_info_map(mock_data_layer)
-        
-        # Should handle error gracefully and set empty map (current implementation)
-        assert manager.component_info_map == {}
-
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -2,48 +2,58 @@
 Pytest configuration and shared fixtures for AgentFusion tests.
 """
 
+import asyncio
 import pytest
-import pytest_asyncio
 import sys
 import os
 from pathlib import Path
 
-# Configure pytest-asyncio to handle async tests properly
-pytest_asyncio.plugin.DEFAULT_LOOP_SCOPE = "function"
+try:
+    import uvloop
+except ImportError:
+    # Not available on Windows; async tests then run on asyncio's loop
+    uvloop = None
 
 # Add the src directory to the Python path for imports
 test_dir = Path(__file__).parent
 src_dir = test_dir.parent / "src"
 sys.path.insert(0, str(src_dir))
 
+# Global builder registries reset around every test; resolved once per session.
+# Each xdist worker is its own process with its own registries.
+try:
+    from builders.utils import McpInfo, AgentInfo, GraphFlowInfo, GroupChatInfo
+    _REGISTRIES = (McpInfo, AgentInfo, GraphFlowInfo, GroupChatInfo)
+except ImportError:
+    # If modules are not available, there is nothing to clean
+    _REGISTRIES = ()
+
 @pytest.fixture(scope="session")
 def test_data_dir():
     """Get the test data directory path."""
     return test_dir / "data"
 
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests marked uvloop on a uvloop event loop, the rest on asyncio's."""
+        if item.get_closest_marker("uvloop") is not None:
+            return {"uvloop": uvloop.new_event_loop}
+        return {"asyncio": asyncio.new_event_loop}
+
 @pytest.fixture(autouse=True)
 def clean_global_state():
     """Clean global state before and after each test."""
-    # Import here to avoid circular imports
-    try:
-        from builders.utils import McpInfo, AgentInfo, GraphFlowInfo, GroupChatInfo
-        
-        # Clear before test
-        McpInfo.clear()
-        AgentInfo.clear()
-        GraphFlowInfo.clear()
-        GroupChatInfo.clear()
-        
-        yield
-        
-        # Clear after test
-        McpInfo.clear()
-        AgentInfo.clear()
-        GraphFlowInfo.clear()
-        GroupChatInfo.clear()
-    except ImportError:
-        # If modules are not available, just yield
-        yield
+    # Clear before test; most tests never fill the registries, so skip empty ones
+    for registry in _REGISTRIES:
+        if registry:
+            registry.clear()
+    
+    yield
+    
+    # Clear after test
+    for registry in _REGISTRIES:
+        if registry:
+            registry.clear()
 
 @pytest.fixture
 def sample_prompt_content():
@@ -0,0 +1,64 @@
+"""
+Test cases for the ToolValidator input validation helpers.
+
+Kept apart from test_tools_comprehensive.py so they run even when the
+tool modules that file imports are unavailable.
+"""
+
+import pytest
+
+from tools.utils.validation import ToolValidator, ValidationError
+
+
+class TestToolValidator:
+    """Test cases for ToolValidator class"""
+
+    def test_validate_code_snippet_short_code_skips_scan(self):
+        """Test that tiny snippets without dangerous keywords pass"""
+        assert ToolValidator.validate_code_snippet('x=1') == 'x=1'
+        assert ToolValidator.validate_code_snippet('a = b + c') == 'a = b + c'
+
+    def test_validate_code_snippet_bare_dangerous_name(self):
+        """Test that dangerous names are caught without dots, parens or underscores"""
+        with pytest.raises(ValidationError) as exc_info:
+            ToolValidator.validate_code_snippet('from os import REMOVE')
+
+        assert exc_info.value.error_code == 'DANGEROUS_CODE'
+
+    def test_validate_code_snippet_non_ascii_case_folding(self):
+        """Test that dangerous names are matched with the regex's case rules"""
+        # 'İ' is a word character, so there is no word boundary before 'eval'
+        assert ToolValidator.validate_code_snippet('İeval = 1') == 'İeval = 1'
+
+        # Case-insensitive matching treats dotless 'ı' as 'i'
+        with pytest.raises(ValidationError) as exc_info:
+            ToolValidator.validate_code_snippet('rmdır()')
+
+        assert exc_info.value.error_code == 'DANGEROUS_CODE'
+
+    def test_validate_document_id_list_in_place(self):
+        """Test validating a list of document IDs in place"""
+        ids = [' doc1', 'doc2 ']
+        result = ToolValidator.validate_document_id(ids, in_place=True)
+        assert result is ids
+        assert ids == ['doc1', 'doc2']
+
+    def test_validate_document_id_list_in_place_invalid_leaves_list(self):
+        """Test that a failed in-place validation leaves the list untouched"""
+        ids = [' doc1', '  ', 'doc3 ']
+        with pytest.raises(ValidationError) as exc_info:
+            ToolValidator.validate_document_id(ids, in_place=True)
+
+        assert exc_info.value.error_code == 'INVALID_ID_IN_LIST'
+        assert ids == [' doc1', '  ', 'doc3 ']
+
+    def test_safe_execute_os_error_subclass(self):
+        """Test safe execution resolves OSError subclasses to their nearest formatter"""
+        def not_found():
+            raise FileNotFoundError("missing.txt")
+
+        def is_dir():
+            raise IsADirectoryError("some_dir")
+
+        assert ToolValidator.safe_execute(not_found) == 'File Not Found Error: missing.txt'
+        assert ToolValidator.safe_execute(is_dir) == 'OS Error: some_dir'